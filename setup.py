@@ -37,6 +37,9 @@ setup(
     keywords='hardware raspberrypi waveshare hat SIM868',
     license='LGPLv3',
     install_requires=wavehat_dependencies(),
+    extras_require={
+        'async': ['pyserial-asyncio==0.6'],
+    },
     zip_safe=False,
     url='https://github.com/lliendo/WaveHats',
     python_requires='>=3.9.2',
@@ -18,11 +18,15 @@ Copyleft 2023 - present, Lucas Liendo.
 """
 
 import RPi.GPIO as GPIO
-import math
+import itertools
+import operator
 import os
 import serial
+import threading
 import time
 
+from collections import namedtuple
+
 
 class SIM868Error(Exception):
     pass
@@ -36,10 +40,14 @@ class SIM868:
     :param baud_rate: The baud rate for the serial device. Default baud rate: 115200.
     :param encoding: An encoding to be used each time a command is sent or
         received from the serial device. Default: None.
+    :param read_timeout: How long (in seconds) to wait for the device to
+        answer before giving up on a read. Default: 0.05.
     """
 
     AT_END_MARK = b'\r\n'
+    AT_END_MARK_STR = '\r\n'
     AT_ERROR = b'ERROR\r\n'
+    AT_ERROR_STR = 'ERROR'  # Status as returned by `split_at_response`.
     AT_OK = b'OK\r\n'
     AT_PROMPT = b'> '
     DEFAULT_BAUD_RATE = 115200
@@ -50,22 +58,24 @@ class SIM868:
         'gnss_run_status', 'fix_status', 'utc_datetime', 'latitude', 'longitude',
         'msl_altitude', 'speed_over_ground', 'course_over_ground', 'fix_mode',
         'reserved1', 'hdop', 'pdop', 'vdop', 'reserved2', 'gnss_satellites_in_view',
-        'gnss_satellites_used', 'glonass_satellites_used', 'reserved3', 'c/n0_max',
+        'gnss_satellites_used', 'glonass_satellites_used', 'reserved3', 'cn0_max',
         'hpa', 'vpa',
     ]
     OUTPUT_PIN = 7  # GPIO pin used for turning on/off the hat.
     SMS_MAX_LENGTH = 160
-    SMS_FIELDS = ['source', 'from', 'date', 'sms']
-    READ_TIMEOUT = 1
+    SMS_FIELDS = ['source', 'from_', 'date', 'sms']
+    READ_TIMEOUT = 0.05  # In seconds.
 
-    def __init__(self, device=DEFAULT_DEVICE, baud_rate=DEFAULT_BAUD_RATE, encoding=None):
-        self._encoding = encoding
+    def __init__(self, device=DEFAULT_DEVICE, baud_rate=DEFAULT_BAUD_RATE, encoding=None,
+                 read_timeout=READ_TIMEOUT):
+        self._set_encoding(encoding)
+        self.forget_sms_settings()
         self._serial_line = serial.Serial(
-            port=device, baudrate=baud_rate, timeout=self.READ_TIMEOUT
+            port=device, baudrate=baud_rate, timeout=read_timeout
         )
         self.hat_powered = self._is_hat_powered()
         self.turn_hat()
-        self.at_echo = 'AT' in self.at('AT')  # Check if AT echo is on or off.
+        self.at_echo = b'AT' in self._send_at('AT')  # Check if AT echo is on or off.
 
     def _is_hat_powered(self):
         """
@@ -73,7 +83,7 @@ class SIM868:
 
         :return: A boolean indicating if the hat is powered on or off.
         """
-        self._serial_line.flush()
+        self._serial_line.reset_input_buffer()
         self._serial_line.write(b'AT\r')
         at_expected_responses = [
             b'AT\r\r\nOK\r\n',  # AT echo is on.
@@ -84,7 +94,6 @@ class SIM868:
 
         if at_response in at_expected_responses:
             hat_powered = True
-            self._serial_line.timeout = 0  # Clear the initial timeout.
 
         return hat_powered
 
@@ -99,45 +108,108 @@ class SIM868:
             at_response.endswith(self.AT_ERROR) or \
             at_response.endswith(self.AT_PROMPT)
 
-    def _press_power_key(self):
+    def _press_power_key_start(self):
         """
-        Send a `GPIO.LOW` signal for `DEFAULT_POWER_ON_TIME` seconds
-        to turn on or off the hat.
+        Send a `GPIO.LOW` signal to start pressing the power key.
         """
         GPIO.setmode(GPIO.BOARD)
         GPIO.setup(self.OUTPUT_PIN, GPIO.OUT)
         GPIO.output(self.OUTPUT_PIN, GPIO.LOW)
-        time.sleep(self.DEFAULT_POWER_ON_TIME)
+        self._power_key_pressed_at = time.monotonic()
+
+    def _power_key_remaining_time(self):
+        """
+        Tell how long the power key still needs to be held down.
+
+        :return: The remaining time in seconds.
+        """
+        elapsed_time = time.monotonic() - self._power_key_pressed_at
+        return max(0, self.DEFAULT_POWER_ON_TIME - elapsed_time)
+
+    def _press_power_key_release(self):
+        """
+        Send a `GPIO.HIGH` signal to release the power key, waiting until
+        it has been held down for `DEFAULT_POWER_ON_TIME` seconds.
+        """
+        time.sleep(self._power_key_remaining_time())
         GPIO.output(self.OUTPUT_PIN, GPIO.HIGH)
         GPIO.cleanup()
 
-    def _encode_or_decode(self, string, encode=True):
-        encode_decode = getattr(string, f"{'encode' if encode else 'decode'}")
-        return encode_decode(self._encoding) if self._encoding else string
+    def _press_power_key(self):
+        """
+        Press the power key for `DEFAULT_POWER_ON_TIME` seconds
+        to turn on or off the hat.
+        """
+        self._press_power_key_start()
+        self._press_power_key_release()
 
-    def _format_command(self, command, raw):
-        formatted_command = (
-            f"{f'{command}' if raw else f'AT+{command}'}" + ('' if raw else '\r')
-        )
+    def _set_encoding(self, encoding):
+        """
+        Pick the functions used to encode commands and decode responses
+        once instead of on every command.
 
-        return self._encode_or_decode(formatted_command)
+        :param encoding: The encoding supplied by the user (if any). ASCII
+            is used when talking to the device if no encoding is given.
+        """
+        self._encoding = encoding
+        self._encode = operator.methodcaller('encode', encoding or 'ascii')
+        self._decode = operator.methodcaller('decode', encoding or 'ascii')
+
+    def _format_command(self, command, raw):
+        return self._encode(command if raw else 'AT+' + command + '\r')
 
     def split_at_response(self, at_response):
         """
         Split a response into uselful tokens and get the status.
 
-        :param at_response: A raw response from the device.
-        :return: A tuple containing a list of tokens and a status.
+        :param at_response: A response from the device. Either raw `bytes`
+            or a string as returned by `at`.
+        :return: A tuple containing a list of strings and a status.
         """
+        raw_response = isinstance(at_response, bytes)
         tokens = [
-            token for token in at_response.split(self.AT_END_MARK.decode('ascii')) if token
+            token for token in at_response.split(
+                self.AT_END_MARK if raw_response else self.AT_END_MARK_STR
+            ) if token
         ]
         status = tokens.pop(len(tokens) - 1)
 
         # Return relevant tokens regardless AT echo is on or off.
-        return tokens[1 if self.at_echo else 0:], status
+        tokens = tokens[1 if self.at_echo else 0:]
 
-    def at(self, command, raw=False):
+        # Only decode the tokens we're returning (skipping the AT echo).
+        if raw_response:
+            tokens = [self._decode(token) for token in tokens]
+            status = self._decode(status)
+
+        return tokens, status
+
+    def _send_at(self, command, raw=False):
+        """
+        Send an AT command to Waveshare's hat and wait for its response.
+
+        :param command: See `at`.
+        :param raw: See `at`.
+        :return: A `bytes` object containing the raw response from the device.
+        """
+        if not self.hat_powered:
+            raise SIM868Error("Error - The device is not turned on.")
+
+        # Discard any stale output (E.g: unsolicited result codes) so it
+        # doesn't get mixed up with the response.
+        self._serial_line.reset_input_buffer()
+        formatted_command = self._format_command(command, raw)
+        self._serial_line.write(formatted_command)
+        at_response = bytearray()
+
+        # Block (up to `READ_TIMEOUT` seconds) until at least one byte arrives
+        # and then grab everything already buffered in a single read.
+        while not self._is_at_response_complete(at_response):
+            at_response.extend(self._serial_line.read(self._serial_line.in_waiting or 1))
+
+        return bytes(at_response)
+
+    def at(self, command, raw=False, parse=False, error_message=None):
         """
         Send an AT command to Waveshare's hat.
 
@@ -145,40 +217,70 @@ class SIM868:
             the `AT+` prefix nor the `\r` ending. E.g: `.at('CGNSINF')`.
         :param raw: Allows to send a full AT command when this
             kwarg is `True`. E.g: `.at('AT+CGNSINF\r')`.
+        :param parse: If `True` the response is split (see `split_at_response`)
+            and a `SIM868Error` is raised if the command failed. Default: False.
+        :param error_message: The message for the error raised when `parse`
+            is `True` and the command fails. Default: None.
         :return: Either an encoded string if this object was supplied the
-            `encoding` kwarg or a `bytearray` containing the raw response
-            from the device.
+            `encoding` kwarg or a `bytes` object containing the raw response
+            from the device. If `parse` is `True` a tuple as returned by
+            `split_at_response`.
         """
-        if not self.hat_powered:
-            raise SIM868Error("Error - The device is not turned on.")
+        at_response = self._send_at(command, raw)
 
-        formatted_command = self._format_command(command, raw)
-        self._serial_line.write(formatted_command)
-        at_response = b''
+        if parse:
+            return self._parse_at_response(at_response, command, error_message)
 
-        while not self._is_at_response_complete(at_response):
-            if self._serial_line.in_waiting > 0:
-                at_response += self._serial_line.read()
+        return self._decode(at_response) if self._encoding else at_response
+
+    def _chain_commands(self, *commands):
+        """
+        Join several AT commands into a single command line.
 
-        self._serial_line.flush()
+        :param commands: Strings containing AT commands without the `AT+`
+            prefix nor the `\r` ending.
+        :return: A string to be sent through `at`. E.g: `CMGF=1;+CMGR=1`.
+        """
+        return ';+'.join(commands)
+
+    def at_chain(self, *commands):
+        """
+        Send several AT commands to Waveshare's hat in a single command line.
 
-        return self._encode_or_decode(at_response, encode=False)
+        :param commands: Strings containing AT commands without the `AT+`
+            prefix nor the `\r` ending. E.g: `.at_chain('CMGF=1', 'CMGR=1')`
+            sends `AT+CMGF=1;+CMGR=1\r`.
+        :return: See `at`. Note that the device reports a single status
+            for the whole chain.
+        """
+        return self.at(self._chain_commands(*commands))
 
-    def turn_hat(self, on=True):
+    def turn_hat(self, on=True, background=False):
         """
         Turn on/off Waveshare's hat.
 
         :param on: Boolean indicating if the hat should be turned on or off.
+        :param background: If `True` the power key is pressed from a background
+            thread and this method returns immediately, allowing to do something
+            else in the meantime. Join the returned thread before sending any
+            commands to the device. Default: False.
+        :return: The thread pressing the power key if `background` is `True`.
         """
+        if background:
+            thread = threading.Thread(target=self.turn_hat, kwargs={'on': on})
+            thread.start()
+            return thread
+
         if on and not self.hat_powered:
             self._press_power_key()
             self.hat_powered = True
-            self._serial_line.flush()
+            self.forget_sms_settings()
             self._serial_line.reset_input_buffer()
 
         if not on and self.hat_powered:
             self._press_power_key()
             self.hat_powered = False
+            self.forget_sms_settings()
 
     def turn_gnss(self, on=True):
         """
@@ -189,9 +291,50 @@ class SIM868:
         return self.at(f'CGNSPWR={1 if on else 0}')
 
     def _check_at_status_response(self, at_response, status, error_message):
-        if status == self.AT_ERROR.decode('ascii').strip():
+        if status == self.AT_ERROR_STR:
             raise SIM868Error(f'Error - {error_message}. Details: {at_response}.')
 
+    def _parse_at_response(self, at_response, command, error_message):
+        """
+        Split a raw response and raise an error if the command failed.
+
+        :param at_response: A `bytes` object containing the raw response.
+        :param command: The command that was sent.
+        :param error_message: The message for the error raised if the command
+            failed. If `None` a message is built from the command.
+        :return: A tuple as returned by `split_at_response`.
+        """
+        at_response, status = self.split_at_response(at_response)
+        self._check_at_status_response(
+            at_response, status, error_message or f'{command.strip()} failed'
+        )
+
+        return at_response, status
+
+    def _parse_position(self, at_response):
+        """
+        Build a GNSS reading out of a split `CGNSINF` response.
+
+        :param at_response: A list of tokens as returned by `split_at_response`.
+        :return: A `GNSSPosition` named tuple.
+        """
+        gnss_values = at_response[0].removeprefix('+CGNSINF: ').split(
+            ',', maxsplit=len(self.GNSS_FIELDS) - 1
+        )
+        position = []
+
+        # Pick the right type upfront rather than catching a `ValueError`
+        # on every floating point field.
+        for gnss_value in gnss_values:
+            if not gnss_value:
+                position.append(None)
+            elif '.' in gnss_value or 'e' in gnss_value:
+                position.append(float(gnss_value))
+            else:
+                position.append(int(gnss_value))
+
+        return GNSSPosition(*position)
+
     @property
     def position(self):
         """
@@ -201,26 +344,16 @@ class SIM868:
         calling this propery to get a valid reading as signal reception
         is not immediate.
 
-        :return: A dictionary containing all the fields specified in the
-            `SIM868.GNSS_FIELDS` class attribute list.
+        :return: A `GNSSPosition` named tuple containing all the fields
+            specified in the `SIM868.GNSS_FIELDS` class attribute list.
+            Call its `_asdict` method if you need a dictionary.
         """
-        at_response, status = self.split_at_response(self.at('CGNSINF'))
-        self._check_at_status_response(
-            at_response, status, 'CGNSINF failed. Unable to get GNSS reading'
+        at_response, _ = self.at(
+            'CGNSINF', parse=True,
+            error_message='CGNSINF failed. Unable to get GNSS reading'
         )
-        gnss_values = at_response[0].replace('+CGNSINF: ', '').split(',')
-        position = {}
-
-        for gnss_field, gnss_value in zip(self.GNSS_FIELDS, gnss_values):
-            if gnss_value:
-                try:
-                    position[gnss_field] = int(gnss_value)
-                except ValueError:
-                    position[gnss_field] = float(gnss_value)
-            else:
-                position[gnss_field] = None
 
-        return position
+        return self._parse_position(at_response)
 
     def _valid_sms(self, nth):
         """
@@ -234,6 +367,21 @@ class SIM868:
         _, max_capacity = self.total_smses()
         return (1 <= nth <= max_capacity)
 
+    def _parse_total_smses(self, at_response):
+        """
+        Get the SMSes count and max capacity out of a split `CPMS` response.
+
+        :param at_response: A list of tokens as returned by `split_at_response`.
+        :return: A tuple with two integers indicating the total used
+            SMSes slots and maximum capacity.
+        """
+        message_storage = at_response[0].replace('+CPMS: ', '')
+        total, max_capacity, *_ = [
+            int(n) for n in message_storage.split(',')
+        ]
+
+        return total, max_capacity
+
     def total_smses(self, source=DEFAULT_SMS_SOURCE):
         """
         Tell the number of current SMSes and max capacity from source.
@@ -243,17 +391,186 @@ class SIM868:
         :return: A tuple with two integers indicating the total used
             SMSes slots and maximum capacity.
         """
-        at_response, status = self.split_at_response(self.at(f'CPMS="{source.upper()}"'))
-        self._check_at_status_response(
-            at_response, status,
-            f'CPMS failed. Unable to get total number of SMSes from {source}'
+        at_response, _ = self.at(
+            f'CPMS="{source.upper()}"', parse=True,
+            error_message=f'CPMS failed. Unable to get total number of SMSes from {source}'
         )
-        message_storage = at_response[0].replace('+CPMS: ', '')
-        total, max_capacity, *_ = [
-            int(n) for n in message_storage.split(',')
+        self._current_cpms_source = source.upper()
+
+        return self._parse_total_smses(at_response)
+
+    def forget_sms_settings(self):
+        """
+        Forget the SMS format (`CMGF`) and storage (`CPMS`) last selected so
+        they're selected again before the next SMS operation.
+
+        Call this method if you change any of them through `at`.
+        """
+        self._current_cmgf = self._current_cpms_source = None
+
+    def _ensure_cmgf(self):
+        """
+        Set the SMS format to text mode unless it was already set.
+        """
+        if self._current_cmgf != 1:
+            self.at(
+                'CMGF=1', parse=True, error_message='CMGF failed. Unable to set SMS text mode'
+            )
+            self._current_cmgf = 1
+
+    def _ensure_cpms(self, source):
+        """
+        Select source as the SMS storage unless it was already selected.
+
+        :param source: The SMS storage to be selected.
+        """
+        if source.upper() != self._current_cpms_source:
+            self.total_smses(source=source)
+
+    def _chain_sms_setup(self, command, source, query_storage=False):
+        """
+        Chain a SMS command after the CMGF/CPMS selections it needs (skipping
+        the ones already in effect) so everything takes a single round-trip
+        to the device.
+
+        The current selections are forgotten until the chained command
+        succeeds as there's no way to tell which of its parts failed.
+
+        :param command: The SMS command. E.g: `CMGR=1`.
+        :param source: The SMS storage the command applies to.
+        :param query_storage: If `True` the storage is selected even if it
+            already was, to get its SMSes count. Default: False.
+        :return: A string containing the chained command.
+        """
+        commands = []
+
+        if self._current_cmgf != 1:
+            commands.append('CMGF=1')
+
+        if query_storage or source.upper() != self._current_cpms_source:
+            commands.append(f'CPMS="{source.upper()}"')
+
+        self.forget_sms_settings()
+
+        return self._chain_commands(*commands, command)
+
+    def _record_sms_setup(self, source, at_response):
+        """
+        Record the SMS format and storage selected by a successful chained
+        SMS command and drop the `CPMS` result from its response.
+
+        :param source: The SMS storage that was selected.
+        :param at_response: A list of tokens as returned by `split_at_response`.
+        :return: A tuple with the list of tokens belonging to the SMS command
+            itself and the storage counts (as returned by `total_smses`) or
+            `None` if the storage wasn't selected.
+        """
+        self._current_cmgf = 1
+        self._current_cpms_source = source.upper()
+
+        # The `CPMS` result (if any) always comes first as it's chained
+        # before the SMS command.
+        if at_response and at_response[0].startswith('+CPMS: '):
+            return at_response[1:], self._parse_total_smses(at_response[:1])
+
+        return at_response, None
+
+    def _sms_at(self, command, source, error_message, query_storage=False):
+        """
+        Send a SMS command chained after the CMGF/CPMS selections it needs.
+
+        :param command: The SMS command. E.g: `CMGR=1`.
+        :param source: The SMS storage the command applies to.
+        :param error_message: The message for the error raised if the
+            command fails.
+        :param query_storage: See `_chain_sms_setup`.
+        :return: A tuple as returned by `_record_sms_setup`.
+        """
+        at_response, _ = self.at(
+            self._chain_sms_setup(command, source, query_storage=query_storage),
+            parse=True, error_message=error_message
+        )
+
+        return self._record_sms_setup(source, at_response)
+
+    def _build_sms(self, sms_metadata, sms_body, nth):
+        """
+        Build a SMS out of its metadata and body.
+
+        :param sms_metadata: A string containing the SMS metadata as reported
+            by the device with the command prefix (and index) already removed.
+        :param sms_body: A string containing the SMS itself.
+        :param nth: The SMS number.
+        :return: A `SMSRecord` named tuple.
+        """
+        sms_metadata = sms_metadata.split('","')
+        sms_metadata.pop(2)  # This field seems to be always empty so skip it.
+        sms_metadata = itertools.islice(sms_metadata, len(self.SMS_FIELDS) - 1)
+
+        return SMSRecord(
+            *(value.strip('"') for value in sms_metadata), sms_body.strip('"'), nth=nth
+        )
+
+    def _parse_sms(self, at_response, nth):
+        """
+        Build a SMS out of a split `CMGR` response.
+
+        :param at_response: A list of tokens as returned by `split_at_response`.
+        :param nth: The SMS number that was read.
+        :return: A `SMSRecord` named tuple or `None` if there's no SMS
+            at that index.
+        """
+        sms = None
+
+        if at_response:
+            sms = self._build_sms(at_response[0].replace('+CMGR: ', ''), at_response[1], nth)
+
+        return sms
+
+    def _parse_smses(self, at_response):
+        """
+        Build a list of SMSes out of a split `CMGL` response.
+
+        Each SMS is reported as a `+CMGL: ` header line (starting with the
+        SMS index) followed by the line(s) of the SMS itself.
+
+        :param at_response: A list of tokens as returned by `split_at_response`.
+        :return: A list of `SMSRecord` named tuples.
+        """
+        smses = []
+
+        for token in at_response:
+            if token.startswith('+CMGL: '):
+                nth, sms_metadata = token.replace('+CMGL: ', '').split(',', 1)
+                smses.append((int(nth), sms_metadata, []))
+            elif smses:
+                smses[-1][2].append(token)
+
+        return [
+            self._build_sms(sms_metadata, self.AT_END_MARK_STR.join(sms_body), nth)
+            for nth, sms_metadata, sms_body in smses
         ]
 
-        return total, max_capacity
+    def _check_smses(self, smses, total, source, stat):
+        """
+        Make sure a `CMGL` listing is not missing any SMS.
+
+        A SMS line reading just `OK` or `ERROR` ends the response early,
+        which would silently drop all the following SMSes.
+
+        :param smses: A list of SMSes as returned by `_parse_smses`.
+        :param total: The number of SMSes stored in source.
+        :param source: The source the SMSes were listed from.
+        :param stat: The status the SMSes were listed with.
+        :return: The list of SMSes.
+        """
+        if stat.upper() == 'ALL' and len(smses) != total:
+            raise SIM868Error(
+                f'Error - CMGL failed. Got {len(smses)} out of {total} SMSes '
+                f'from {source.upper()}.'
+            )
+
+        return smses
 
     def get_sms(self, nth, source=DEFAULT_SMS_SOURCE, check_nth=True):
         """
@@ -265,54 +582,49 @@ class SIM868:
             Default value: `DEFAULT_SMS_SOURCE` which is the simcard.
         :param check_nth: If True it will raise an error if the SMS number
             is not in the expected range.
-        :return: A dictionary containing all the fields specified in the
-            `SIM868.SMS_FIELDS` class attribute list. The `nth` key is also
-            added to record the index.
+        :return: A `SMSRecord` named tuple containing all the fields specified
+            in the `SIM868.SMS_FIELDS` class attribute list. The `nth` field is
+            also added to record the index. Call its `_asdict` method if you
+            need a dictionary.
         """
         if check_nth and (not self._valid_sms(nth)):
             raise SIM868Error(f'Error - Message #{nth} is out of range.')
 
-        self.at('CMGF=1')
-        self.at(f'CPMS="{source.upper()}"')
-        at_response, status = self.split_at_response(self.at(f'CMGR={nth}'))
-        self._check_at_status_response(
-            at_response, status,
-            f'CMGS failed. Unable to read SMS #{nth} from {source.upper()}'
+        at_response, _ = self._sms_at(
+            f'CMGR={nth}', source,
+            f'CMGR failed. Unable to read SMS #{nth} from {source.upper()}'
         )
-        sms = None
 
-        if at_response:
-            sms_metadata = at_response[0].replace('+CMGR: ', '').split('","')
-            sms_metadata.pop(2)  # This field seems to be always empty so skip it.
-            sms = {
-                key: value.strip('"')
-                for key, value in zip(self.SMS_FIELDS, sms_metadata + [at_response[1]])
-            }
-            sms['nth'] = nth
-
-        return sms
+        return self._parse_sms(at_response, nth)
 
-    def get_smses(self, source=DEFAULT_SMS_SOURCE):
+    def list_smses(self, source=DEFAULT_SMS_SOURCE, stat='ALL'):
         """
-        Get all SMSes from source.
+        Get all SMSes from source with a single `CMGL` command.
 
         :param source: The source where to retrieve SMSes. Default value: "SM"
             which is the simcard.
-        :return: A list of dictionaries containing all the available SMSes.
-            Each dictionary contains the following keys: 'source',
-            'from', 'number', 'date', 'sms'.
+        :param stat: Only retrieve SMSes with this status. One of: "REC UNREAD",
+            "REC READ", "STO UNSENT", "STO SENT" or "ALL". Default value: "ALL".
+        :return: A list of `SMSRecord` named tuples as returned by `get_sms`.
         """
-        total_smses, _ = self.total_smses()
-        smses, nth = [], 1
+        at_response, (total, _) = self._sms_at(
+            f'CMGL="{stat.upper()}"', source,
+            f'CMGL failed. Unable to list SMSes from {source.upper()}', query_storage=True
+        )
 
-        while total_smses > 0:
-            if (nth_sms := self.get_sms(nth, source=source, check_nth=False)):
-                smses.append(nth_sms)
-                total_smses -= 1
+        return self._check_smses(self._parse_smses(at_response), total, source, stat)
 
-            nth += 1
+    def get_smses(self, source=DEFAULT_SMS_SOURCE):
+        """
+        Get all SMSes from source.
 
-        return smses
+        :param source: The source where to retrieve SMSes. Default value: "SM"
+            which is the simcard.
+        :return: A list of `SMSRecord` named tuples containing all the
+            available SMSes. Each one contains the following fields: 'source',
+            'from_', 'date', 'sms', 'nth'.
+        """
+        return self.list_smses(source=source)
 
     def delete_sms(self, nth, source=DEFAULT_SMS_SOURCE, check_nth=True):
         """
@@ -329,11 +641,10 @@ class SIM868:
         :return: The deleted SMS.
         """
         if sms := self.get_sms(nth, source=source, check_nth=check_nth):
-            self.at(f'CPMS="{source.upper()}"')
-            at_response, status = self.split_at_response(self.at(f'CMGD={nth}'))
-            self._check_at_status_response(
-                at_response, status,
-                f'CMGD failed. Unable to delete SMS #{nth} from {source.upper()}'
+            self._ensure_cpms(source)
+            self.at(
+                f'CMGD={nth}', parse=True,
+                error_message=f'CMGD failed. Unable to delete SMS #{nth} from {source.upper()}'
             )
 
         return sms
@@ -348,7 +659,7 @@ class SIM868:
         smses = self.get_smses(source=source)
 
         for sms in smses:
-            self.delete_sms(sms['nth'], source=source, check_nth=False)
+            self.delete_sms(sms.nth, source=source, check_nth=False)
 
         return smses
 
@@ -360,22 +671,31 @@ class SIM868:
         :param mobile_number: A string containing the receiver of the SMS.
             E.g: +923234206521.
         """
-        self.at('CMGF=1')
-        at_response = self.at(f'CMGS="{mobile_number}"')
+        self._ensure_cmgf()
+        at_response = self._send_at(f'CMGS="{mobile_number}"')
 
-        if not at_response.endswith(self.AT_PROMPT.decode('ascii')):
-            self._serial_line.flush()
+        if not at_response.endswith(self.AT_PROMPT):
+            self._serial_line.reset_input_buffer()
             raise SIM868Error('Error - Unable to get AT prompt to push SMS to device.')
 
         # The \x1A byte makes the '> ' prompt end and the SMS to be sent.
-        at_response, status = self.split_at_response(
-            self.at(f'{sms_part}\x1A', raw=True)
-        )
-        self._check_at_status_response(
-            at_response, status, 'CMGS failed. Unable to send SMS'
+        return self.at(
+            f'{sms_part}\x1A', raw=True, parse=True,
+            error_message='CMGS failed. Unable to send SMS'
         )
 
-        return at_response, status
+    def _split_message(self, message, sms_max_length):
+        """
+        Split a message into chunks of at most `sms_max_length` characters.
+
+        :param message: A string containing the SMS.
+        :param sms_max_length: The maximum length of each chunk.
+        :return: A list of strings.
+        """
+        return [
+            message[offset : offset + sms_max_length]
+            for offset in range(0, len(message), sms_max_length)
+        ]
 
     def send_sms(self, message, mobile_number, sms_max_length=SMS_MAX_LENGTH):
         """
@@ -392,14 +712,15 @@ class SIM868:
         if not message or not mobile_number:
             raise SIM868Error(f"Error - `message` and/or `mobile_number` can't be empty.")
 
-        total_offsets = math.ceil(len(message) / self.SMS_MAX_LENGTH)
-        sms_parts = [
-            message[offset * sms_max_length : (offset + 1) * sms_max_length]
-            for offset in range(0, total_offsets)
-        ]
         at_responses = []
 
-        for sms_part in sms_parts:
+        for sms_part in self._split_message(message, sms_max_length):
             at_responses.append(self._send_sms(sms_part, mobile_number))
 
         return at_responses
+
+
+SMSRecord = namedtuple('SMSRecord', SIM868.SMS_FIELDS + ['nth'])
+GNSSPosition = namedtuple(
+    'GNSSPosition', SIM868.GNSS_FIELDS, defaults=[None] * len(SIM868.GNSS_FIELDS)
+)
@@ -0,0 +1,412 @@
+"""
+This file is part of WaveHat.
+
+WaveHat is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+WaveHat is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+Lesser GNU General Public License for more details.
+
+You should have received a copy of the Lesser GNU General Public License
+along with WaveHat. If not, see <http://www.gnu.org/licenses/>.
+
+Copyleft 2023 - present, Lucas Liendo.
+"""
+
+import asyncio
+import contextlib
+import serial_asyncio
+
+from wavehat import SIM868, SIM868Error
+
+
+class _SIM868Protocol(asyncio.Protocol):
+    """
+    Buffer the bytes coming from the device and signal when an AT
+    response is complete.
+
+    :param is_at_response_complete: A callable that tells if the buffered
+        bytes make up a complete AT response.
+    """
+
+    def __init__(self, is_at_response_complete):
+        self._is_at_response_complete = is_at_response_complete
+        self._at_response = bytearray()
+        self._response_ready = asyncio.Event()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self._at_response.extend(data)
+
+        if self._is_at_response_complete(self._at_response):
+            self._response_ready.set()
+
+    def connection_lost(self, exc):
+        self.transport = None
+        self._response_ready.set()  # Wake up any pending reader.
+
+    def reset_input_buffer(self):
+        """
+        Discard any buffered (and possibly incomplete) response.
+        """
+        self._at_response.clear()
+        self._response_ready.clear()
+
+    async def read_response(self):
+        """
+        Wait until a complete AT response has been received.
+
+        :return: A `bytes` object containing the raw response from the device.
+        """
+        await self._response_ready.wait()
+
+        if self.transport is None:
+            raise SIM868Error('Error - The connection to the device was lost.')
+
+        at_response = bytes(self._at_response)
+        self.reset_input_buffer()
+
+        return at_response
+
+
+class AsyncSIM868(SIM868):
+    """
+    asyncio flavour of `SIM868`.
+
+    All methods that talk to the device are coroutines so the event loop is
+    free to run other tasks while waiting for the hat to answer. Commands are
+    still sent one at a time as they all share the same serial line, and
+    operations made of several commands (E.g: sending a SMS) are never
+    interleaved with other tasks.
+
+    Instances must be created through the `create` coroutine. E.g:
+    `sim868 = await AsyncSIM868.create(device='/dev/ttyAMA0')`.
+
+    :param encoding: An encoding to be used each time a command is sent or
+        received from the serial device. Default: None.
+    :param read_timeout: How long (in seconds) to wait for the device to
+        answer when checking if the hat is powered. Default: 0.05.
+    """
+
+    def __init__(self, encoding=None, read_timeout=SIM868.READ_TIMEOUT):
+        self._set_encoding(encoding)
+        self._read_timeout = read_timeout
+        self.forget_sms_settings()
+        self._transport = None
+        self._protocol = None
+        self._session_lock = asyncio.Lock()
+        self._session_task = None  # Task currently holding the serial line.
+        self.hat_powered = False
+        self.at_echo = False
+
+    @classmethod
+    async def create(cls, device=SIM868.DEFAULT_DEVICE, baud_rate=SIM868.DEFAULT_BAUD_RATE,
+                     encoding=None, read_timeout=SIM868.READ_TIMEOUT):
+        """
+        Open the serial device and turn on the hat if necessary.
+
+        :param device: Absolute path to the serial device. Default path: '/dev/ttyS0'.
+        :param baud_rate: The baud rate for the serial device. Default baud rate: 115200.
+        :param encoding: An encoding to be used each time a command is sent or
+            received from the serial device. Default: None.
+        :param read_timeout: How long (in seconds) to wait for the device to
+            answer when checking if the hat is powered. Default: 0.05.
+        :return: An `AsyncSIM868` object.
+        """
+        sim868 = cls(encoding=encoding, read_timeout=read_timeout)
+        sim868._transport, sim868._protocol = await serial_asyncio.create_serial_connection(
+            asyncio.get_running_loop(),
+            lambda: _SIM868Protocol(sim868._is_at_response_complete),
+            device, baudrate=baud_rate
+        )
+        sim868.hat_powered = await sim868._is_hat_powered()
+        await sim868.turn_hat()
+        sim868.at_echo = b'AT' in await sim868._send_at('AT')  # Check if AT echo is on or off.
+
+        return sim868
+
+    def close(self):
+        """
+        Close the serial device.
+        """
+        self._transport.close()
+
+    async def _is_hat_powered(self):
+        """
+        Check if the serial device exists and is turned on.
+
+        :return: A boolean indicating if the hat is powered on or off.
+        """
+        self._protocol.reset_input_buffer()
+        self._transport.write(b'AT\r')
+        at_expected_responses = [
+            b'AT\r\r\nOK\r\n',  # AT echo is on.
+            b'\r\nOK\r\n',  # AT is off.
+        ]
+
+        try:
+            at_response = await asyncio.wait_for(
+                self._protocol.read_response(), self._read_timeout
+            )
+        except asyncio.TimeoutError:
+            self._protocol.reset_input_buffer()
+            return False
+
+        return at_response in at_expected_responses
+
+    @contextlib.asynccontextmanager
+    async def _session(self):
+        """
+        Hold the serial line for a whole operation, which might take several
+        commands (E.g: sending a SMS) or rely on the SMS format and storage
+        currently selected. Sessions opened again from the task already
+        holding the line are no-ops.
+        """
+        current_task = asyncio.current_task()
+
+        if self._session_task is current_task:
+            yield
+            return
+
+        async with self._session_lock:
+            self._session_task = current_task
+
+            try:
+                yield
+            finally:
+                self._session_task = None
+
+    async def _send_at(self, command, raw=False):
+        """
+        Send an AT command to Waveshare's hat and wait for its response.
+
+        See `SIM868._send_at` for details.
+        """
+        if not self.hat_powered:
+            raise SIM868Error("Error - The device is not turned on.")
+
+        async with self._session():
+            # Discard any stale output (E.g: unsolicited result codes) so it
+            # doesn't get mixed up with the response.
+            self._protocol.reset_input_buffer()
+            self._transport.write(self._format_command(command, raw))
+            return await self._protocol.read_response()
+
+    async def at(self, command, raw=False, parse=False, error_message=None):
+        """
+        Send an AT command to Waveshare's hat.
+
+        See `SIM868.at` for details.
+        """
+        at_response = await self._send_at(command, raw)
+
+        if parse:
+            return self._parse_at_response(at_response, command, error_message)
+
+        return self._decode(at_response) if self._encoding else at_response
+
+    async def at_chain(self, *commands):
+        """
+        Send several AT commands to Waveshare's hat in a single command line.
+
+        See `SIM868.at_chain` for details.
+        """
+        return await self.at(self._chain_commands(*commands))
+
+    async def _press_power_key(self):
+        """
+        Press the power key for `DEFAULT_POWER_ON_TIME` seconds without
+        blocking the event loop.
+        """
+        self._press_power_key_start()
+        await asyncio.sleep(self._power_key_remaining_time())
+        self._press_power_key_release()
+
+    async def turn_hat(self, on=True):
+        """
+        Turn on/off Waveshare's hat.
+
+        :param on: Boolean indicating if the hat should be turned on or off.
+        """
+        if on and not self.hat_powered:
+            await self._press_power_key()
+            self.hat_powered = True
+            self.forget_sms_settings()
+            self._protocol.reset_input_buffer()
+
+        if not on and self.hat_powered:
+            await self._press_power_key()
+            self.hat_powered = False
+            self.forget_sms_settings()
+
+    async def turn_gnss(self, on=True):
+        """
+        Turn on/off the GNSS.
+
+        :param on: Boolean indicating if the GNSS should be turned on or off.
+        """
+        return await self.at(f'CGNSPWR={1 if on else 0}')
+
+    async def _position(self):
+        at_response, _ = await self.at(
+            'CGNSINF', parse=True,
+            error_message='CGNSINF failed. Unable to get GNSS reading'
+        )
+
+        return self._parse_position(at_response)
+
+    @property
+    def position(self):
+        """
+        Get a GNSS reading. This property must be awaited.
+        E.g: `await sim868.position`.
+
+        See `SIM868.position` for details.
+        """
+        return self._position()
+
+    async def _valid_sms(self, nth):
+        _, max_capacity = await self.total_smses()
+        return (1 <= nth <= max_capacity)
+
+    async def total_smses(self, source=SIM868.DEFAULT_SMS_SOURCE):
+        """
+        Tell the number of current SMSes and max capacity from source.
+
+        See `SIM868.total_smses` for details.
+        """
+        async with self._session():
+            at_response, _ = await self.at(
+                f'CPMS="{source.upper()}"', parse=True,
+                error_message=f'CPMS failed. Unable to get total number of SMSes from {source}'
+            )
+            self._current_cpms_source = source.upper()
+
+            return self._parse_total_smses(at_response)
+
+    async def _ensure_cmgf(self):
+        if self._current_cmgf != 1:
+            await self.at(
+                'CMGF=1', parse=True, error_message='CMGF failed. Unable to set SMS text mode'
+            )
+            self._current_cmgf = 1
+
+    async def _ensure_cpms(self, source):
+        if source.upper() != self._current_cpms_source:
+            await self.total_smses(source=source)
+
+    async def _sms_at(self, command, source, error_message, query_storage=False):
+        at_response, _ = await self.at(
+            self._chain_sms_setup(command, source, query_storage=query_storage),
+            parse=True, error_message=error_message
+        )
+
+        return self._record_sms_setup(source, at_response)
+
+    async def get_sms(self, nth, source=SIM868.DEFAULT_SMS_SOURCE, check_nth=True):
+        """
+        Get the nth SMS from source.
+
+        See `SIM868.get_sms` for details.
+        """
+        async with self._session():
+            if check_nth and (not await self._valid_sms(nth)):
+                raise SIM868Error(f'Error - Message #{nth} is out of range.')
+
+            at_response, _ = await self._sms_at(
+                f'CMGR={nth}', source,
+                f'CMGR failed. Unable to read SMS #{nth} from {source.upper()}'
+            )
+
+            return self._parse_sms(at_response, nth)
+
+    async def list_smses(self, source=SIM868.DEFAULT_SMS_SOURCE, stat='ALL'):
+        """
+        Get all SMSes from source with a single `CMGL` command.
+
+        See `SIM868.list_smses` for details.
+        """
+        async with self._session():
+            at_response, (total, _) = await self._sms_at(
+                f'CMGL="{stat.upper()}"', source,
+                f'CMGL failed. Unable to list SMSes from {source.upper()}', query_storage=True
+            )
+
+            return self._check_smses(self._parse_smses(at_response), total, source, stat)
+
+    async def get_smses(self, source=SIM868.DEFAULT_SMS_SOURCE):
+        """
+        Get all SMSes from source.
+
+        See `SIM868.get_smses` for details.
+        """
+        return await self.list_smses(source=source)
+
+    async def delete_sms(self, nth, source=SIM868.DEFAULT_SMS_SOURCE, check_nth=True):
+        """
+        Delete the nth SMS from source.
+
+        See `SIM868.delete_sms` for details.
+        """
+        async with self._session():
+            if sms := await self.get_sms(nth, source=source, check_nth=check_nth):
+                await self._ensure_cpms(source)
+                await self.at(
+                    f'CMGD={nth}', parse=True,
+                    error_message=(
+                        f'CMGD failed. Unable to delete SMS #{nth} from {source.upper()}'
+                    )
+                )
+
+            return sms
+
+    async def delete_smses(self, source=SIM868.DEFAULT_SMS_SOURCE):
+        """
+        Delete all SMS from source.
+
+        See `SIM868.delete_smses` for details.
+        """
+        smses = await self.get_smses(source=source)
+
+        for sms in smses:
+            await self.delete_sms(sms.nth, source=source, check_nth=False)
+
+        return smses
+
+    async def _send_sms(self, sms_part, mobile_number):
+        async with self._session():
+            await self._ensure_cmgf()
+            at_response = await self._send_at(f'CMGS="{mobile_number}"')
+
+            if not at_response.endswith(self.AT_PROMPT):
+                self._protocol.reset_input_buffer()
+                raise SIM868Error('Error - Unable to get AT prompt to push SMS to device.')
+
+            # The \x1A byte makes the '> ' prompt end and the SMS to be sent.
+            return await self.at(
+                f'{sms_part}\x1A', raw=True, parse=True,
+                error_message='CMGS failed. Unable to send SMS'
+            )
+
+    async def send_sms(self, message, mobile_number, sms_max_length=SIM868.SMS_MAX_LENGTH):
+        """
+        Send a SMS (and split it if necessary).
+
+        See `SIM868.send_sms` for details.
+        """
+        if not message or not mobile_number:
+            raise SIM868Error(f"Error - `message` and/or `mobile_number` can't be empty.")
+
+        at_responses = []
+
+        for sms_part in self._split_message(message, sms_max_length):
+            at_responses.append(await self._send_sms(sms_part, mobile_number))
+
+        return at_responses